@@ -4,12 +4,23 @@ Final Backend — Theme-B (single accent #0000CC)
 Provides:
  - POST /analyze -> JSON { deadlock, deadlocked_processes, cycle, visualization (base64 PNG), algorithms }
  - POST /export  -> PDF (rich Theme B) or PNG (format="png")
+ - format="svg" on either endpoint -> lightweight direct-SVG rendering instead of matplotlib
+ - POST /cycles  -> NDJSON stream of every elementary cycle (limit, max_length, cursor)
+
+Wire formats (both endpoints):
+ - request body: JSON, or MessagePack with Content-Type: application/msgpack
+ - edges: [["P1","R1"], ...], [{"from","to","amount"}, ...] or columnar
+   {"nodes": [...], "request_edges": {"from": [i...], "to": [i...], "amount": [n...]}}
+ - /analyze replies in MessagePack (raw PNG bytes, no base64) for Accept: application/msgpack
+ - JSON/MessagePack replies are br/gzip compressed per Accept-Encoding
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context
 from flask_cors import CORS
 import io
 import base64
+import gzip
+import json
 import networkx as nx
 import matplotlib
 matplotlib.use("Agg")
@@ -22,6 +33,24 @@ from io import BytesIO
 from PIL import Image
 from datetime import datetime
 import textwrap
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from xml.sax.saxutils import escape as xml_escape
+
+from result_store import ResultStore, graph_key
+
+try:
+    import msgpack
+except ImportError:  # optional: MessagePack wire format
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # optional: br response compression (gzip always works)
+    brotli = None
 
 app = Flask(__name__)
 CORS(app)
@@ -49,6 +78,66 @@ def hex_to_rgb_frac(hexstr):
 
 ACCENT_RGB = hex_to_rgb_frac(ACCENT_HEX)
 
+MSGPACK_MIMETYPES = ("application/msgpack", "application/x-msgpack")
+COMPRESSIBLE_MIMETYPES = ("application/json", "application/msgpack", "image/svg+xml")
+MIN_COMPRESS_BYTES = 1024
+
+# -------------------------------------------------------
+# WIRE FORMATS (request decoding, response encoding, compression)
+# -------------------------------------------------------
+def read_payload():
+    if request.mimetype in MSGPACK_MIMETYPES:
+        if msgpack is None:
+            raise ValueError("MessagePack payloads need the 'msgpack' package on the server")
+        return msgpack.unpackb(request.get_data(), raw=False) or {}
+    return request.get_json(force=True) or {}
+
+
+def wants_msgpack():
+    if msgpack is None:
+        return False
+    best = request.accept_mimetypes.best_match(("application/json",) + MSGPACK_MIMETYPES)
+    return best in MSGPACK_MIMETYPES
+
+
+def analysis_response(result, image, fmt="png"):
+    """
+    JSON carries a PNG as base64; MessagePack carries the raw bytes.
+    SVG is markup and goes out as a plain string either way.
+    """
+    result = {**result, "visualization_format": fmt}
+    if wants_msgpack():
+        body = msgpack.packb({**result, "visualization": image}, use_bin_type=True)
+        return Response(body, mimetype="application/msgpack")
+    if fmt == "png":
+        image = base64.b64encode(image).decode("utf-8")
+    return jsonify({**result, "visualization": image})
+
+
+@app.after_request
+def compress_response(resp):
+    if (resp.mimetype not in COMPRESSIBLE_MIMETYPES
+            or resp.direct_passthrough
+            or not 200 <= resp.status_code < 300
+            or "Content-Encoding" in resp.headers):
+        return resp
+
+    data = resp.get_data()
+    if len(data) < MIN_COMPRESS_BYTES:
+        return resp
+
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        resp.set_data(brotli.compress(data, quality=5))
+        resp.headers["Content-Encoding"] = "br"
+    elif accepted["gzip"]:
+        resp.set_data(gzip.compress(data, compresslevel=6))
+        resp.headers["Content-Encoding"] = "gzip"
+    else:
+        return resp
+    resp.vary.add("Accept-Encoding")
+    return resp
+
 # -------------------------------------------------------
 # NORMALIZATION (Accept new + old formats)
 # -------------------------------------------------------
@@ -73,17 +162,38 @@ def normalize_payload(payload):
 
     out["resources"] = resources_norm
 
-    # Edges normalization
+    # Edges normalization -> list of (from, to, amount) tuples
+    # Columnar node table: explicit "nodes" or processes followed by resources
+    nodes = payload.get("nodes") or (
+        list(out["processes"]) + [r["id"] for r in resources_norm]
+    )
+
+    def parse_columnar(cols):
+        src_idx = cols.get("from", [])
+        dst_idx = cols.get("to", [])
+        amounts = cols.get("amount") or [1] * len(src_idx)
+        if not len(src_idx) == len(dst_idx) == len(amounts):
+            raise ValueError("columnar edges need equal-length 'from', 'to' and 'amount' arrays")
+        n_nodes = len(nodes)
+        for i in (*src_idx, *dst_idx):
+            if isinstance(i, bool) or not isinstance(i, int) or not 0 <= i < n_nodes:
+                raise ValueError(f"columnar edge index {i!r} is not an integer in 0..{n_nodes - 1}")
+        src = [nodes[i] for i in src_idx]
+        dst = [nodes[i] for i in dst_idx]
+        return list(zip(src, dst, map(int, amounts)))
+
     def parse_edges(raw_list):
+        if isinstance(raw_list, dict):
+            return parse_columnar(raw_list)
         result = []
         for item in raw_list or []:
             if isinstance(item, (list, tuple)) and len(item) >= 2:
-                result.append({"from": item[0], "to": item[1], "amount": 1})
+                result.append((item[0], item[1], 1))
             elif isinstance(item, dict):
                 u = item.get("from") or item.get("u") or item.get("src")
                 v = item.get("to") or item.get("v") or item.get("dst")
                 amt = int(item.get("amount", 1))
-                result.append({"from": u, "to": v, "amount": amt})
+                result.append((u, v, amt))
         return result
 
     out["request_edges"] = parse_edges(payload.get("request_edges", []))
@@ -104,11 +214,11 @@ def build_graph(norm):
     for r in norm["resources"]:
         G.add_node(r["id"], ntype="resource", instances=r["instances"])
 
-    for e in norm["request_edges"]:
-        G.add_edge(e["from"], e["to"], etype="request", amount=e["amount"])
+    for u, v, amt in norm["request_edges"]:
+        G.add_edge(u, v, etype="request", amount=amt)
 
-    for e in norm["allocation_edges"]:
-        G.add_edge(e["from"], e["to"], etype="alloc", amount=e["amount"])
+    for u, v, amt in norm["allocation_edges"]:
+        G.add_edge(u, v, etype="alloc", amount=amt)
 
     return G
 
@@ -129,6 +239,73 @@ def detect_cycle(G):
     return cycles_sorted[0]
 
 
+# -------------------------------------------------------
+# CYCLE ENUMERATION (streaming, per nontrivial SCC)
+# -------------------------------------------------------
+def nontrivial_sccs(G):
+    """SCCs that can hold a cycle, in a stable order."""
+    comps = [
+        c for c in nx.strongly_connected_components(G)
+        if len(c) > 1 or any(G.has_edge(n, n) for n in c)
+    ]
+    return sorted(comps, key=lambda c: sorted(map(str, c)))
+
+
+def encode_cursor(key, scc, offset, max_length=None):
+    # offsets only make sense for the same graph *and* the same enumeration bounds
+    raw = json.dumps({"g": key[:16], "s": scc, "o": offset, "m": max_length},
+                     separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor, key, max_length=None):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        scc, offset = int(data["s"]), int(data["o"])
+    except Exception:
+        raise ValueError("invalid cursor")
+    if data.get("g") != key[:16]:
+        raise ValueError("cursor belongs to a different graph")
+    if data.get("m") != max_length:
+        raise ValueError("cursor was issued with a different max_length")
+    return scc, offset
+
+
+def iter_cycle_records(G, key, limit=None, max_length=None, start=(0, 0)):
+    """
+    Yield NDJSON-ready dicts: {"type": "cycle"} per cycle, {"type": "scc"}
+    after each SCC, then one {"type": "end"} with next_cursor if truncated.
+    Cycles come straight from nx.simple_cycles; nothing is kept in memory.
+    Resuming re-enumerates the skipped prefix of the current SCC.
+    """
+    sccs = nontrivial_sccs(G)
+    start_scc, skip = start
+    emitted = 0
+
+    for i in range(start_scc, len(sccs)):
+        comp = sccs[i]
+        sub = G.subgraph(comp)
+        found = 0
+        cycles = nx.simple_cycles(sub, length_bound=max_length)
+        for cycle in cycles:
+            found += 1
+            if found <= skip:
+                continue
+            if limit is not None and emitted >= limit:
+                yield {"type": "scc", "scc": i, "nodes": len(comp),
+                       "cycles": found - 1, "complete": False}
+                yield {"type": "end", "emitted": emitted, "truncated": True,
+                       "next_cursor": encode_cursor(key, i, found - 1, max_length)}
+                return
+            emitted += 1
+            yield {"type": "cycle", "scc": i, "cycle": cycle}
+        skip = 0
+        yield {"type": "scc", "scc": i, "nodes": len(comp),
+               "cycles": found, "complete": True}
+
+    yield {"type": "end", "emitted": emitted, "truncated": False, "next_cursor": None}
+
+
 # -------------------------------------------------------
 # MULTI-INSTANCE DEADLOCK DETECTOR (Banker style)
 # -------------------------------------------------------
@@ -152,9 +329,7 @@ def detect_deadlock_multi_instance(norm):
     Request = [[0]*m for _ in range(n)]
 
     # Fill allocation
-    for e in allocs:
-        u, v = e["from"], e["to"]
-        amt = e["amount"]
+    for u, v, amt in allocs:
         if u in res_idx and v in proc_idx:     # R -> P
             Allocation[proc_idx[v]][res_idx[u]] += amt
             Available[res_idx[u]] -= amt
@@ -165,9 +340,7 @@ def detect_deadlock_multi_instance(norm):
     Available = [max(0, a) for a in Available]
 
     # Fill requests
-    for e in reqs:
-        u, v = e["from"], e["to"]
-        amt = e["amount"]
+    for u, v, amt in reqs:
         if u in proc_idx and v in res_idx:
             Request[proc_idx[u]][res_idx[v]] += amt
         elif v in proc_idx and u in res_idx:
@@ -193,11 +366,197 @@ def detect_deadlock_multi_instance(norm):
     return {"deadlocked": bool(deadlocked), "deadlocked_processes": deadlocked}
 
 
+# -------------------------------------------------------
+# COMPONENT DECOMPOSITION (weakly connected, analyzed in parallel)
+# -------------------------------------------------------
+PROCESS_POOL_MIN_SIZE = 5000   # nodes + edges of the largest component
+POOL_WORKERS = os.cpu_count() or 2
+_thread_pool = None
+_process_pool = None
+_pool_lock = threading.Lock()
+
+
+def split_components(norm):
+    """
+    Split a normalized payload into weakly connected sub-payloads. Processes,
+    resources and edges keep their original relative order; components are
+    ordered by their first node in processes-then-resources order.
+    """
+    parent = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    order = list(norm["processes"]) + [r["id"] for r in norm["resources"]]
+    for n in order:
+        find(n)
+    edges = norm["request_edges"] + norm["allocation_edges"]
+    for u, v, _ in edges:
+        ru, rv = find(u), find(v)
+        if ru != rv:
+            parent[rv] = ru
+
+    comps = {}
+    def comp(root):
+        if root not in comps:
+            comps[root] = {"processes": [], "resources": [],
+                           "request_edges": [], "allocation_edges": []}
+        return comps[root]
+
+    for p in norm["processes"]:
+        comp(find(p))["processes"].append(p)
+    for r in norm["resources"]:
+        comp(find(r["id"]))["resources"].append(r)
+    for name in ("request_edges", "allocation_edges"):
+        for e in norm[name]:
+            comp(find(e[0]))[name].append(e)
+
+    # dict preserves first-seen order, which follows `order`
+    return list(comps.values())
+
+
+def is_trivially_deadlock_free(sub):
+    """
+    True when no process both holds and requests, every edge points the
+    canonical way (P -> R request, R -> P allocation) and no request exceeds
+    the resource's total instances. Such a component can have neither a
+    cycle nor a Banker-style deadlock.
+    """
+    procs = set(sub["processes"])
+    instances = {r["id"]: r["instances"] for r in sub["resources"]}
+
+    requesters = set()
+    wanted = {}
+    for u, v, amt in sub["request_edges"]:
+        if u not in procs or v not in instances:
+            return False
+        requesters.add(u)
+        wanted[(u, v)] = wanted.get((u, v), 0) + amt
+
+    for u, v, _ in sub["allocation_edges"]:
+        if u not in instances or v not in procs or v in requesters:
+            return False
+
+    return all(amt <= instances[r] for (_, r), amt in wanted.items())
+
+
+def analyze_component(sub):
+    """Full detection for one component (runs in a worker thread/process)."""
+    multi = detect_deadlock_multi_instance(sub)
+    cycle = detect_cycle(build_graph(sub)) or []
+    return {"deadlocked_processes": multi["deadlocked_processes"], "cycle": cycle}
+
+
+def _process_context():
+    # never fork() the threaded server: held locks (logging, sqlite) would be
+    # copied into the children in a locked state
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _component_pool(largest):
+    global _thread_pool, _process_pool
+    with _pool_lock:
+        # detection is pure Python, so only big components are worth the pickling
+        if largest >= PROCESS_POOL_MIN_SIZE:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(max_workers=POOL_WORKERS,
+                                                    mp_context=_process_context())
+            return _process_pool
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(max_workers=POOL_WORKERS)
+        return _thread_pool
+
+
+def _discard_process_pool(broken):
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is broken:
+            _process_pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_components(largest, subs):
+    pool = _component_pool(largest)
+    try:
+        return list(pool.map(analyze_component, subs))
+    except BrokenProcessPool:
+        # a worker died; replace the pool and retry once on a fresh one
+        app.logger.warning("Component process pool broken; recreating it")
+        _discard_process_pool(pool)
+        return list(_component_pool(largest).map(analyze_component, subs))
+
+
+def analyze_components(norm):
+    """
+    Per-component detection merged into whole-graph answers. Returns
+    (deadlocked_processes, cycle, summaries); the merge is independent of
+    scheduling order.
+    """
+    subs = split_components(norm)
+    results = [None] * len(subs)
+    todo = []
+
+    for i, sub in enumerate(subs):
+        if is_trivially_deadlock_free(sub):
+            results[i] = {"deadlocked_processes": [], "cycle": [], "skipped": True}
+            continue
+        key = graph_key(sub)
+        cached = STORE.get_json(key, "component") if STORE else None
+        if cached is not None:
+            results[i] = cached
+        else:
+            todo.append((i, key))
+
+    if len(todo) == 1:
+        i, _ = todo[0]
+        results[i] = analyze_component(subs[i])
+    elif todo:
+        size = lambda sub: (len(sub["processes"]) + len(sub["resources"]) +
+                            len(sub["request_edges"]) + len(sub["allocation_edges"]))
+        largest = max(size(subs[i]) for i, _ in todo)
+        for (i, _), res in zip(todo, _run_components(largest, [subs[i] for i, _ in todo])):
+            results[i] = res
+    for i, key in todo:
+        results[i]["skipped"] = False
+        if STORE:
+            STORE.put_json(key, "component", results[i])
+
+    # deterministic merge: processes in payload order, globally shortest cycle
+    dead = set()
+    for res in results:
+        dead.update(res["deadlocked_processes"])
+    deadlocked = [p for p in norm["processes"] if p in dead]
+
+    cycles = [res["cycle"] for res in results if res["cycle"]]
+    cycle = min(cycles, key=lambda c: (len(c), ",".join(c))) if cycles else []
+
+    summaries = [
+        {
+            "index": i,
+            "processes": len(sub["processes"]),
+            "resources": len(sub["resources"]),
+            "edges": len(sub["request_edges"]) + len(sub["allocation_edges"]),
+            "skipped": res["skipped"],
+            "deadlock": bool(res["deadlocked_processes"]),
+            "deadlocked_processes": res["deadlocked_processes"],
+            "cycle": res["cycle"],
+        }
+        for i, (sub, res) in enumerate(zip(subs, results))
+    ]
+    return deadlocked, cycle, summaries
+
+
 # -------------------------------------------------------
 # DRAW PNG (amounts + instance dots)
 # -------------------------------------------------------
-def draw_png_bytes(G, cycle_nodes):
-    pos = nx.spring_layout(G, seed=42)
+def draw_png_bytes(G, cycle_nodes, pos=None):
+    if pos is None:
+        pos = nx.spring_layout(G, seed=42)
 
     fig = plt.Figure(figsize=(9, 6), dpi=120, facecolor=BG)
     ax = fig.add_subplot(111)
@@ -252,67 +611,272 @@ def draw_png_bytes(G, cycle_nodes):
     return buf.read()
 
 
+# -------------------------------------------------------
+# DRAW SVG (direct string building, same theme as draw_png_bytes)
+# -------------------------------------------------------
+SVG_WIDTH = 900
+SVG_HEIGHT = 600
+SVG_PAD = 50
+SVG_NODE_R = 22      # matches NODE_SIZE markers at the PNG's scale
+SVG_FONT = "DejaVu Sans, Arial, sans-serif"
+
+
+def draw_svg(G, cycle_nodes, pos=None):
+    if pos is None:
+        pos = nx.spring_layout(G, seed=42)
+
+    # fit layout coordinates into the viewBox (y axis flipped like matplotlib);
+    # plain floats + preformatted strings keep the loops below cheap
+    xy = {n: (float(p[0]), float(p[1])) for n, p in pos.items()}
+    xs = [p[0] for p in xy.values()] or [0.0]
+    ys = [p[1] for p in xy.values()] or [0.0]
+    min_x, min_y = min(xs), min(ys)
+    span = max(max(xs) - min_x, max(ys) - min_y) or 1.0
+    scale = (min(SVG_WIDTH, SVG_HEIGHT) - 2 * SVG_PAD) / span
+    off_x = (SVG_WIDTH - (max(xs) - min_x) * scale) / 2
+    off_y = SVG_HEIGHT - (SVG_HEIGHT - (max(ys) - min_y) * scale) / 2
+
+    pts = {n: (off_x + (x - min_x) * scale, off_y - (y - min_y) * scale) for n, (x, y) in xy.items()}
+    fmt = {n: (f"{x:.1f}", f"{y:.1f}") for n, (x, y) in pts.items()}
+
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {SVG_WIDTH} {SVG_HEIGHT}" '
+        f'width="{SVG_WIDTH}" height="{SVG_HEIGHT}" font-family="{SVG_FONT}" '
+        f'text-anchor="middle" dominant-baseline="central">',
+        f'<rect width="100%" height="100%" fill="{BG}"/>',
+    ]
+    append = out.append
+
+    # edges
+    for u, v, d in G.edges(data=True):
+        x1, y1 = fmt[u]
+        x2, y2 = fmt[v]
+        is_dead = u in cycle_nodes and v in cycle_nodes
+
+        color = DEADLOCK_COLOR if is_dead else (
+            REQUEST_EDGE if d["etype"] == "request" else ALLOC_EDGE
+        )
+        lw = 3 if is_dead else 1.6
+        append(f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" stroke="{color}" stroke-width="{lw}"/>')
+
+        # amount
+        if d.get("amount", 1) > 1:
+            (ux, uy), (vx, vy) = pts[u], pts[v]
+            append(f'<text x="{(ux + vx) / 2:.1f}" y="{(uy + vy) / 2:.1f}" '
+                   f'fill="white" font-size="11">{d["amount"]}</text>')
+
+    # nodes
+    r = SVG_NODE_R
+    dot_dx = 0.02 * scale
+    dot_dy = 0.045 * scale
+    for n, data in G.nodes(data=True):
+        x, y = pts[n]
+        sx, sy = fmt[n]
+        is_dead = n in cycle_nodes
+        color = DEADLOCK_COLOR if is_dead else (
+            PROCESS_COLOR if data["ntype"] == "process" else RESOURCE_COLOR
+        )
+
+        if data["ntype"] == "process":
+            append(f'<circle cx="{sx}" cy="{sy}" r="{r}" fill="{color}" '
+                   f'stroke="{NODE_EDGE_COLOR}" stroke-width="1.2"/>')
+        else:
+            append(f'<rect x="{x - r:.1f}" y="{y - r:.1f}" width="{2 * r}" height="{2 * r}" '
+                   f'fill="{color}" stroke="{NODE_EDGE_COLOR}" stroke-width="1.2"/>')
+        append(f'<text x="{sx}" y="{sy}" fill="{NODE_TEXT_COLOR}" font-size="12">'
+               f'{xml_escape(str(n))}</text>')
+
+        # instance dots (same data-space offsets as the PNG)
+        if data["ntype"] == "resource":
+            inst = data.get("instances", 1)
+            dy = f"{y - dot_dy:.1f}"
+            for i in range(inst):
+                append(f'<circle cx="{x + dot_dx * (i - inst / 2):.1f}" cy="{dy}" r="3" '
+                       f'fill="#8be9fd" stroke="#ffffff" stroke-width="0.8"/>')
+
+    append("</svg>")
+    return "".join(out)
+
+
+# -------------------------------------------------------
+# PERSISTENT RESULT STORE (optional, see result_store.py)
+# -------------------------------------------------------
+# Bump whenever the analysis result shape, layout or rendering changes so
+# entries written by older deploys are no longer served.
+RESULTS_VERSION = 3
+STORE = ResultStore.from_env(version=RESULTS_VERSION)
+
+
+def store_get(key, kind):
+    return STORE.get(key, kind) if STORE else None
+
+
+def store_put(key, kind, data):
+    if STORE:
+        STORE.put(key, kind, data)
+
+
+def analyze_cached(norm, key):
+    result = STORE.get_json(key, "analysis") if STORE else None
+    if result is not None:
+        return result
+
+    # multi-instance + cycle, per weakly connected component
+    deadlocked, cycle, components = analyze_components(norm)
+    algo1 = "multi-instance-matrix" if deadlocked else "no-deadlock-matrix"
+    algo2 = "graph-cycle" if cycle else "no-cycle-detected"
+
+    result = {
+        "deadlock": bool(deadlocked),
+        "deadlocked_processes": deadlocked,
+        "cycle": cycle,
+        "algorithm_used": algo1,
+        "cycle_algorithm_used": algo2,
+        "components": components
+    }
+    if STORE:
+        STORE.put_json(key, "analysis", result)
+    return result
+
+
+def layout_cached(G, key):
+    # stored as [x, y] pairs in G.nodes() order: JSON would stringify non-str node ids
+    nodes = list(G.nodes())
+    coords = STORE.get_json(key, "layout") if STORE else None
+    if coords is None or len(coords) != len(nodes):
+        pos = nx.spring_layout(G, seed=42)
+        coords = [[float(pos[n][0]), float(pos[n][1])] for n in nodes]
+        if STORE:
+            STORE.put_json(key, "layout", coords)
+    return dict(zip(nodes, coords))
+
+
+def render_png_cached(G, cycle, key):
+    png = store_get(key, "png")
+    if png is None:
+        png = draw_png_bytes(G, set(cycle), layout_cached(G, key))
+        store_put(key, "png", png)
+    return png
+
+
+def render_svg_cached(G, cycle, key):
+    svg = store_get(key, "svg")
+    if svg is not None:
+        return svg.decode("utf-8")
+    svg = draw_svg(G, set(cycle), layout_cached(G, key))
+    store_put(key, "svg", svg.encode("utf-8"))
+    return svg
+
+
 # -------------------------------------------------------
 # ANALYZE
 # -------------------------------------------------------
 @app.route("/analyze", methods=["POST"])
 def analyze():
     try:
-        raw = request.get_json(force=True) or {}
+        raw = read_payload()
         norm = normalize_payload(raw)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
 
-        # multi-instance
-        multi = detect_deadlock_multi_instance(norm)
-        algo1 = "multi-instance-matrix" if multi["deadlocked"] else "no-deadlock-matrix"
+    try:
+        key = graph_key(norm)
 
-        # cycle
         G = build_graph(norm)
-        cycle = detect_cycle(G) or []
-        algo2 = "graph-cycle" if cycle else "no-cycle-detected"
+        result = analyze_cached(norm, key)
 
-        png = draw_png_bytes(G, set(cycle))
-        b64 = base64.b64encode(png).decode("utf-8")
+        if (raw.get("format") or "png").lower() == "svg":
+            return analysis_response(result, render_svg_cached(G, result["cycle"], key), "svg")
 
-        return jsonify({
-            "deadlock": multi["deadlocked"],
-            "deadlocked_processes": multi["deadlocked_processes"],
-            "cycle": cycle,
-            "visualization": b64,
-            "algorithm_used": algo1,
-            "cycle_algorithm_used": algo2
-        })
+        png = render_png_cached(G, result["cycle"], key)
+        return analysis_response(result, png)
 
     except Exception as e:
         app.logger.exception("Analyze failed")
         return jsonify({"error": str(e)}), 500
 
 
+# -------------------------------------------------------
+# ENUMERATE ALL CYCLES (NDJSON stream)
+# -------------------------------------------------------
+def optional_positive_int(raw, name):
+    value = raw.get(name)
+    if value is None:
+        return None
+    value = int(value)
+    if value < 1:
+        raise ValueError(f"{name} must be >= 1")
+    return value
+
+
+@app.route("/cycles", methods=["POST"])
+def enumerate_cycles():
+    try:
+        raw = read_payload()
+        norm = normalize_payload(raw)
+        key = graph_key(norm)
+        limit = optional_positive_int(raw, "limit")
+        max_length = optional_positive_int(raw, "max_length")
+        cursor = raw.get("cursor")
+        start = decode_cursor(cursor, key, max_length) if cursor else (0, 0)
+        G = build_graph(norm)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    def generate():
+        try:
+            for record in iter_cycle_records(G, key, limit, max_length, start):
+                yield json.dumps(record, separators=(",", ":")) + "\n"
+        except Exception as e:
+            app.logger.exception("Cycle enumeration failed")
+            yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
 # -------------------------------------------------------
 # EXPORT REPORT (PDF or PNG)
 # -------------------------------------------------------
 @app.route("/export", methods=["POST"])
 def export_report():
     try:
-        raw = request.get_json(force=True) or {}
+        raw = read_payload()
         norm = normalize_payload(raw)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
         fmt = (raw.get("format") or "pdf").lower()
 
+        key = graph_key(norm)
         G = build_graph(norm)
-        cycle = detect_cycle(G)
-        multi = detect_deadlock_multi_instance(norm)
-
-        # visualization
-        backend_png = raw.get("backendVisualizationBase64")
+        result = analyze_cached(norm, key)
+        cycle = result["cycle"]
+        multi = {"deadlocked": result["deadlock"],
+                 "deadlocked_processes": result["deadlocked_processes"]}
+
+        # SVG Export (no matplotlib / PIL involved)
+        if fmt == "svg":
+            resp = Response(render_svg_cached(G, cycle, key), mimetype="image/svg+xml")
+            resp.headers["Content-Disposition"] = "attachment; filename=visualization.svg"
+            return resp
+
+        # visualization (raw bytes from MessagePack clients, else base64)
+        backend_png = raw.get("backendVisualization")
+        if not isinstance(backend_png, bytes):
+            backend_png = raw.get("backendVisualizationBase64")
         if backend_png:
             try:
-                img = Image.open(BytesIO(base64.b64decode(backend_png))).convert("RGBA")
+                if isinstance(backend_png, str):
+                    backend_png = base64.b64decode(backend_png)
+                img = Image.open(BytesIO(backend_png)).convert("RGBA")
             except:
                 img = None
         else:
             img = None
 
         if img is None:
-            img = Image.open(BytesIO(draw_png_bytes(G, set(cycle)))).convert("RGBA")
+            img = Image.open(BytesIO(render_png_cached(G, cycle, key))).convert("RGBA")
         req = norm["request_edges"]
         alloc = norm["allocation_edges"]
 
@@ -325,6 +889,7 @@ def export_report():
                              as_attachment=True, download_name="visualization.png")
 
               # ------- PDF EXPORT (Professional Layout) -------
+        # not stored: the footer is stamped per request; analysis and PNG above are
         buffer = BytesIO()
         pdf = canvas.Canvas(buffer, pagesize=landscape(A4))
         width, height = landscape(A4)
@@ -359,8 +924,8 @@ def export_report():
         pdf.drawString(left_x, y, f"Processes: {', '.join(norm['processes'])}")
         y -= 14
 
-        pdf.drawString(left_x, y,
-                    f"Resources: {', '.join([f'{r['id']} ({r['instances']})' for r in norm['resources']])}")
+        resources_text = ", ".join(f"{r['id']} ({r['instances']})" for r in norm["resources"])
+        pdf.drawString(left_x, y, f"Resources: {resources_text}")
         y -= 14
 
         pdf.drawString(left_x, y, f"Request edges: {len(req)}")
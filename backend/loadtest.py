@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+Backend load test — replays Simulator-like traffic against /analyze and /export
+Starts backend.py locally (or targets --url), runs virtual users that edit a
+graph the way the Simulator does and then analyze / export it, and reports
+throughput, p50/p95/p99 latency, error rate and backend RSS over time.
+Usage:
+    python loadtest.py --concurrency 8 --duration 60
+    python loadtest.py --sizes 4,16,64 --patterns grow,churn --rate 20 --json report.json
+    python loadtest.py --url http://localhost:5000 --pid 1234
+The started backend runs without RAG_STORE_* (no result store) unless --use-store.
+"""
+
+import argparse
+import gzip
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional: without it the harness stops advertising br
+    brotli = None
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+ENDPOINTS = ("analyze", "export_pdf", "export_png")
+PATTERNS = ("grow", "deadlock", "churn")
+DEFAULT_MIX = "analyze=0.8,export_pdf=0.1,export_png=0.1"
+# what browsers send, so the backend picks the same encoding as for real users
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+# -----------------------
+# Simulator-like sessions
+# -----------------------
+class Session:
+    """
+    One virtual user. Holds a graph in the Simulator's shape
+    (processes, resources[{id, instances}], edges[{id, from, to, type, amount}])
+    and mutates it with the same kinds of edits the UI offers.
+    """
+
+    def __init__(self, rnd, size, pattern):
+        self.rnd = rnd
+        self.size = size
+        self.pattern = pattern
+        self.last_visualization = None
+        self.reset()
+
+    def reset(self):
+        self.processes = []
+        self.resources = []
+        self.edges = []
+        self.edge_seq = 0
+
+    # ---- edits ----
+    def add_process(self):
+        self.processes.append(f"P{len(self.processes) + 1}")
+
+    def add_resource(self):
+        rid = f"R{len(self.resources) + 1}"
+        self.resources.append({"id": rid, "instances": self.rnd.randint(1, 3)})
+
+    def add_edge(self, src, dst, etype, amount=1):
+        self.edge_seq += 1
+        self.edges.append({"id": f"e{self.edge_seq}", "from": src, "to": dst,
+                           "type": etype, "amount": amount})
+
+    def add_random_edge(self):
+        p = self.rnd.choice(self.processes)
+        r = self.rnd.choice(self.resources)
+        if self.rnd.random() < 0.5:
+            self.add_edge(p, r["id"], "request", self.rnd.randint(1, r["instances"]))
+        else:
+            self.add_edge(r["id"], p, "allocation", 1)
+
+    def remove_random_edge(self):
+        if self.edges:
+            self.edges.pop(self.rnd.randrange(len(self.edges)))
+
+    def edit(self):
+        if self.pattern == "grow":
+            # nodes first, then edges; start over once the graph is dense
+            if len(self.processes) < self.size:
+                self.add_process()
+                self.add_resource()
+            elif len(self.edges) < 3 * self.size:
+                self.add_random_edge()
+            else:
+                self.reset()
+        elif self.pattern == "deadlock":
+            # circular wait: Pi -> Ri -> P(i+1), closed once size is reached
+            n = len(self.processes)
+            if n < self.size:
+                self.add_process()
+                self.add_resource()
+                self.add_edge(f"P{n + 1}", f"R{n + 1}", "request")
+                if n > 0:
+                    self.add_edge(f"R{n}", f"P{n + 1}", "allocation")
+            elif not any(e["from"] == f"R{n}" and e["to"] == "P1" for e in self.edges):
+                self.add_edge(f"R{n}", "P1", "allocation")
+            else:
+                self.reset()
+        else:  # churn: fixed size, edges come and go
+            while len(self.processes) < self.size:
+                self.add_process()
+                self.add_resource()
+            if self.edges and self.rnd.random() < 0.4:
+                self.remove_random_edge()
+            else:
+                self.add_random_edge()
+
+    # ---- payloads (same shapes the frontend sends) ----
+    def analyze_payload(self):
+        # sendGraphToBackend(payload, { compact: true })
+        nodes = self.processes + [r["id"] for r in self.resources]
+        index = {n: i for i, n in enumerate(nodes)}
+
+        def encode(etype):
+            cols = {"from": [], "to": [], "amount": []}
+            for e in self.edges:
+                if e["type"] == etype:
+                    cols["from"].append(index[e["from"]])
+                    cols["to"].append(index[e["to"]])
+                    cols["amount"].append(e["amount"])
+            return cols
+
+        return {"processes": self.processes, "resources": self.resources, "nodes": nodes,
+                "request_edges": encode("request"), "allocation_edges": encode("allocation")}
+
+    def export_payload(self, fmt):
+        # Report.jsx makePayload
+        def edges(etype):
+            return [{"from": e["from"], "to": e["to"], "amount": e["amount"]}
+                    for e in self.edges if e["type"] == etype]
+
+        return {"processes": self.processes, "resources": self.resources,
+                "request_edges": edges("request"), "allocation_edges": edges("allocation"),
+                "backendVisualizationBase64": self.last_visualization, "format": fmt}
+
+
+# -----------------------
+# HTTP + RSS helpers
+# -----------------------
+def post(url, payload, timeout):
+    req = urllib.request.Request(
+        url, data=json.dumps(payload).encode("utf-8"), method="POST",
+        headers={"Content-Type": "application/json", "Accept-Encoding": ACCEPT_ENCODING},
+    )
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        body = resp.read()
+        encoding = resp.headers.get("Content-Encoding")
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        elif encoding == "deflate":
+            body = zlib.decompress(body)
+        elif encoding == "br":
+            body = brotli.decompress(body)
+        return resp.status, body
+
+
+def read_rss_mb(pid):
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    except Exception:
+        return None
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _log_tail(log, limit=4000):
+    log.seek(0)
+    text = log.read().decode("utf-8", "replace").strip()
+    return text[-limit:] or "(no output)"
+
+
+def start_backend(port, use_store=False, timeout=30):
+    code = f"import backend; backend.app.run(host='127.0.0.1', port={port})"
+    env = dict(os.environ)
+    if not use_store:
+        # synthetic graphs must not hit or pollute a real result store
+        env = {k: v for k, v in env.items() if not k.startswith("RAG_STORE_")}
+    # a file, not a pipe: nobody drains it while the run is going
+    log = tempfile.TemporaryFile()
+    proc = subprocess.Popen([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=log)
+    try:
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError(f"backend exited during startup:\n{_log_tail(log)}")
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                    return proc
+            except OSError:
+                time.sleep(0.2)
+        proc.terminate()
+        raise RuntimeError(f"backend did not start listening in time:\n{_log_tail(log)}")
+    finally:
+        log.close()
+
+
+# -----------------------
+# Load runner
+# -----------------------
+class LoadRun:
+    def __init__(self, args, base_url, server_pid):
+        self.args = args
+        self.base_url = base_url.rstrip("/")
+        self.server_pid = server_pid
+        self.records = []            # (endpoint, t_offset, latency_s, ok, status)
+        self.rss = []                # (t_offset, rss_mb)
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+        self.issued = 0
+        self.next_slot = None
+
+    def _acquire(self):
+        """Closed loop by default; with --rate, hand out evenly spaced start times."""
+        with self.lock:
+            if self.args.requests and self.issued >= self.args.requests:
+                return False
+            self.issued += 1
+            if not self.args.rate:
+                return True
+            now = time.perf_counter()
+            slot = max(now, self.next_slot or now)
+            self.next_slot = slot + 1.0 / self.args.rate
+        delay = slot - time.perf_counter()
+        if delay > 0:
+            self.stop.wait(delay)
+        return not self.stop.is_set()
+
+    def _choose(self, rnd):
+        names = list(self.args.mix)
+        return rnd.choices(names, weights=[self.args.mix[n] for n in names])[0]
+
+    def worker(self, wid):
+        rnd = random.Random(self.args.seed * 1000 + wid)
+        session = None
+        while not self.stop.is_set():
+            if session is None or rnd.random() < 0.02:
+                session = Session(rnd, rnd.choice(self.args.sizes), rnd.choice(self.args.patterns))
+            for _ in range(rnd.randint(1, 3)):
+                session.edit()
+            if not session.processes:
+                continue
+
+            endpoint = self._choose(rnd)
+            # the Report page only exports after an analysis
+            if endpoint != "analyze" and session.last_visualization is None:
+                endpoint = "analyze"
+            if not self._acquire():
+                break
+
+            if endpoint == "analyze":
+                url, payload = self.base_url + "/analyze", session.analyze_payload()
+            else:
+                url = self.base_url + "/export"
+                payload = session.export_payload(endpoint.split("_")[1])
+
+            t0 = time.perf_counter()
+            status, ok = 0, False
+            try:
+                status, body = post(url, payload, self.args.timeout)
+                ok = status == 200
+                if ok and endpoint == "analyze":
+                    session.last_visualization = json.loads(body).get("visualization")
+            except urllib.error.HTTPError as e:
+                status = e.code
+            except Exception:
+                pass
+            t1 = time.perf_counter()
+            with self.lock:
+                self.records.append((endpoint, t0 - self.t_start, t1 - t0, ok, status))
+
+    def sampler(self):
+        while not self.stop.is_set():
+            rss = read_rss_mb(self.server_pid) if self.server_pid else None
+            if rss is not None:
+                self.rss.append((round(time.perf_counter() - self.t_start, 2), round(rss, 1)))
+            self.stop.wait(self.args.sample_interval)
+
+    def run(self):
+        self.t_start = time.perf_counter()
+        threads = [threading.Thread(target=self.worker, args=(i,), daemon=True)
+                   for i in range(self.args.concurrency)]
+        sampler = threading.Thread(target=self.sampler, daemon=True)
+        sampler.start()
+        for t in threads:
+            t.start()
+
+        deadline = self.t_start + self.args.duration
+        while any(t.is_alive() for t in threads):
+            if time.perf_counter() >= deadline:
+                self.stop.set()
+            time.sleep(0.05)
+        self.elapsed = time.perf_counter() - self.t_start
+        self.stop.set()
+        sampler.join()
+
+
+# -----------------------
+# Reporting
+# -----------------------
+def percentile(sorted_vals, q):
+    if not sorted_vals:
+        return None
+    # nearest-rank
+    k = max(0, min(len(sorted_vals) - 1, math.ceil(q / 100.0 * len(sorted_vals)) - 1))
+    return sorted_vals[k]
+
+
+def summarize(records, elapsed):
+    lat = sorted(r[2] * 1000 for r in records)
+    errors = sum(1 for r in records if not r[3])
+    ms = lambda v: round(v, 2) if v is not None else None
+    return {
+        "requests": len(records),
+        "errors": errors,
+        "error_rate": round(errors / len(records), 4) if records else 0.0,
+        "throughput_rps": round(len(records) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": ms(sum(lat) / len(lat)) if lat else None,
+            "p50": ms(percentile(lat, 50)),
+            "p95": ms(percentile(lat, 95)),
+            "p99": ms(percentile(lat, 99)),
+            "max": ms(lat[-1]) if lat else None,
+        },
+    }
+
+
+def build_report(run):
+    args = run.args
+    report = {
+        "config": {
+            "url": run.base_url, "concurrency": args.concurrency, "rate": args.rate,
+            "duration_s": args.duration, "requests_limit": args.requests,
+            "sizes": args.sizes, "patterns": args.patterns, "mix": args.mix, "seed": args.seed,
+        },
+        "elapsed_s": round(run.elapsed, 2),
+        "overall": summarize(run.records, run.elapsed),
+        "endpoints": {
+            ep: summarize([r for r in run.records if r[0] == ep], run.elapsed)
+            for ep in ENDPOINTS if any(r[0] == ep for r in run.records)
+        },
+        "status_codes": {},
+        "rss_mb": None,
+    }
+    for r in run.records:
+        key = str(r[4])
+        report["status_codes"][key] = report["status_codes"].get(key, 0) + 1
+    if run.rss:
+        values = [v for _, v in run.rss]
+        report["rss_mb"] = {"start": values[0], "peak": max(values), "end": values[-1],
+                            "samples": run.rss}
+    return report
+
+
+def format_report(report):
+    lines = [
+        f"Load test against {report['config']['url']} — {report['elapsed_s']}s, "
+        f"concurrency {report['config']['concurrency']}"
+        + (f", target {report['config']['rate']} req/s" if report["config"]["rate"] else ""),
+        "",
+        f"{'endpoint':<12}{'reqs':>8}{'rps':>9}{'err%':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}",
+    ]
+    rows = list(report["endpoints"].items()) + [("overall", report["overall"])]
+    for name, s in rows:
+        lat = s["latency_ms"]
+        fmt = lambda v: f"{v:.1f}" if v is not None else "-"
+        lines.append(
+            f"{name:<12}{s['requests']:>8}{s['throughput_rps']:>9.2f}{s['error_rate'] * 100:>7.2f}%"
+            f"{fmt(lat['p50']):>10}{fmt(lat['p95']):>10}{fmt(lat['p99']):>10}{fmt(lat['max']):>10}"
+        )
+    lines.append("(latencies in ms)")
+    lines.append("status codes: " + ", ".join(f"{k}={v}" for k, v in sorted(report["status_codes"].items())))
+    if report["rss_mb"]:
+        r = report["rss_mb"]
+        lines.append(f"backend RSS MB: start {r['start']}, peak {r['peak']}, end {r['end']} "
+                     f"({len(r['samples'])} samples)")
+    else:
+        lines.append("backend RSS: not sampled (use --pid with --url)")
+    return "\n".join(lines)
+
+
+# -----------------------
+# CLI
+# -----------------------
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint in mix: {name}")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("mix weights must not all be zero")
+    return mix
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Replay Simulator-like traffic against the RAG backend.")
+    p.add_argument("--url", help="target an already running backend instead of starting one")
+    p.add_argument("--pid", type=int, help="backend PID to sample RSS from when using --url")
+    p.add_argument("--use-store", action="store_true",
+                   help="keep RAG_STORE_* for the started backend (default: run it without the result store)")
+    p.add_argument("-c", "--concurrency", type=int, default=4, help="virtual users (default: 4)")
+    p.add_argument("--rate", type=float, default=0.0, help="global request rate cap in req/s (default: unpaced)")
+    p.add_argument("-d", "--duration", type=float, default=30.0, help="seconds to run (default: 30)")
+    p.add_argument("-n", "--requests", type=int, default=0, help="stop after this many requests (default: no limit)")
+    p.add_argument("--sizes", default="4,8,16,32", help="processes per graph, comma list (default: 4,8,16,32)")
+    p.add_argument("--patterns", default=",".join(PATTERNS), help=f"edit patterns from {','.join(PATTERNS)}")
+    p.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"request mix (default: {DEFAULT_MIX})")
+    p.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    p.add_argument("--sample-interval", type=float, default=1.0, help="RSS sampling period in seconds")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--json", dest="json_path", help="also write the full report as JSON here")
+    args = p.parse_args(argv)
+
+    args.sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    args.patterns = [s.strip() for s in args.patterns.split(",") if s.strip()]
+    bad = [s for s in args.patterns if s not in PATTERNS]
+    if bad or not args.patterns:
+        p.error(f"unknown pattern(s): {', '.join(bad)}")
+    if not args.sizes or min(args.sizes) < 1 or args.concurrency < 1:
+        p.error("sizes and concurrency must be >= 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    proc = None
+    if args.url:
+        base_url, pid = args.url, args.pid
+    else:
+        port = free_port()
+        proc = start_backend(port, args.use_store)
+        base_url, pid = f"http://127.0.0.1:{port}", proc.pid
+
+    try:
+        run = LoadRun(args, base_url, pid)
+        run.run()
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    report = build_report(run)
+    print(format_report(report))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
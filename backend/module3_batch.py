@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Module 3 — Headless batch renderer (no Tk, Agg backend)
+Renders graph/analysis JSON pairs to PNG/PDF stills and deadlock pulse
+animations (GIF/MP4) in a process pool. Usage:
+    python module3_batch.py incidents/ -o renders/ -f png,gif -j 8
+    python module3_batch.py "incidents/**/*graph_data.json" -f pdf
+
+Pairs are matched by name: "<prefix>graph_data.json" goes with
+"<prefix>analysis_output.json" in the same folder. Outputs whose file is
+newer than both inputs are skipped unless --force is given.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.animation import PillowWriter, FFMpegWriter
+
+from rag_render import (
+    BG, FPS, GRAPH_FILE, ANALYSIS_FILE,
+    read_json_files, build_graph, compute_layout,
+    draw_graph, cycle_edges_for, frame_count, draw_pulse_frame,
+)
+
+STILL_FORMATS = ("png", "pdf")
+ANIM_FORMATS = ("gif", "mp4")
+
+# -----------------------
+# Input discovery
+# -----------------------
+def find_pairs(inputs):
+    """Expand dirs/globs/files to a sorted list of (graph_path, analysis_path)."""
+    graphs = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = glob.glob(os.path.join(item, "**", "*" + GRAPH_FILE), recursive=True)
+        else:
+            matches = glob.glob(item, recursive=True)
+        graphs.update(os.path.abspath(m) for m in matches if m.endswith(GRAPH_FILE))
+
+    pairs = []
+    for g in sorted(graphs):
+        prefix = os.path.basename(g)[:-len(GRAPH_FILE)]
+        a = os.path.join(os.path.dirname(g), prefix + ANALYSIS_FILE)
+        pairs.append((g, a))
+    return pairs
+
+
+def output_stem(graph_path, base_dir, out_dir):
+    # mirror the input tree under out_dir so equal prefixes in different folders don't collide
+    rel = os.path.relpath(graph_path, base_dir)
+    return os.path.join(out_dir, rel[:-len(".json")])
+
+
+def temp_path_for(out_path):
+    # same directory so os.replace is an atomic rename; keep the extension for the writers
+    root, ext = os.path.splitext(out_path)
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(root) + ".", suffix=".part" + ext,
+                               dir=os.path.dirname(out_path) or ".")
+    os.close(fd)
+    return tmp
+
+
+def is_up_to_date(out_path, inputs):
+    try:
+        out_mtime = os.path.getmtime(out_path)
+    except OSError:
+        return False
+    return all(os.path.getmtime(p) <= out_mtime for p in inputs)
+
+
+# -----------------------
+# Rendering (runs in worker processes)
+# -----------------------
+def _new_figure():
+    fig = Figure(figsize=(9, 6), dpi=100, facecolor=BG)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    return fig, ax
+
+
+def render_job(job):
+    """
+    Render one pair. Returns dict(graph, written, skipped, error) so the
+    parent can report without any exception crossing the process boundary.
+    """
+    graph_path, analysis_path, stem, formats, dpi, duration, force = job
+    result = {"graph": graph_path, "written": [], "skipped": [], "error": None}
+    tmp = None
+    try:
+        if not os.path.exists(analysis_path):
+            raise FileNotFoundError(f"missing {os.path.basename(analysis_path)}")
+
+        todo = []
+        for fmt in formats:
+            out = f"{stem}.{fmt}"
+            if not force and is_up_to_date(out, (graph_path, analysis_path)):
+                result["skipped"].append(out)
+            else:
+                todo.append((fmt, out))
+        if not todo:
+            return result
+
+        graph_data, analysis = read_json_files(graph_path, analysis_path)
+        G = build_graph(graph_data)
+        pos = compute_layout(G)
+        cycle = list(analysis.get("deadlock_cycle", []))
+        animatable = bool(analysis.get("deadlock", False)) and bool(cycle)
+
+        os.makedirs(os.path.dirname(stem) or ".", exist_ok=True)
+        fig, ax = _new_figure()
+        draw_graph(ax, G, pos, analysis)
+
+        for fmt, out in todo:
+            if fmt not in STILL_FORMATS and not animatable:
+                # nothing to pulse; a still of a safe graph is the whole story
+                result["skipped"].append(out)
+                continue
+            # render to a temp file so a crash never leaves a truncated, "up to date" output
+            tmp = temp_path_for(out)
+            if fmt in STILL_FORMATS:
+                fig.savefig(tmp, format=fmt, dpi=dpi, bbox_inches="tight",
+                            facecolor=fig.get_facecolor())
+            else:
+                _write_animation(fig, ax, pos, G, cycle, tmp, fmt, dpi, duration)
+            os.replace(tmp, out)
+            tmp = None
+            result["written"].append(out)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        if tmp is not None:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+    return result
+
+
+def _write_animation(fig, ax, pos, G, cycle, out, fmt, dpi, duration):
+    for n in cycle:
+        if n not in pos:
+            # fallback place
+            pos[n] = (len(pos), 0)
+    cycle_edges = cycle_edges_for(G, cycle)
+    frames = frame_count(duration)
+
+    writer = PillowWriter(fps=FPS) if fmt == "gif" else FFMpegWriter(fps=FPS)
+    with writer.saving(fig, out, dpi):
+        for frame in range(frames):
+            artists = draw_pulse_frame(ax, pos, cycle, cycle_edges, frame, frames)
+            writer.grab_frame(facecolor=BG)
+            for a in artists:
+                a.remove()
+
+
+# -----------------------
+# CLI
+# -----------------------
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Headless batch renderer for RAG graph/analysis JSON pairs.")
+    p.add_argument("inputs", nargs="+", help="directories, globs or *graph_data.json files")
+    p.add_argument("-o", "--out-dir", default="renders", help="output directory (default: renders)")
+    p.add_argument("-f", "--formats", default="png",
+                   help="comma list of png,pdf,gif,mp4 (default: png)")
+    p.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                   help="worker processes (default: CPU count)")
+    p.add_argument("--dpi", type=int, default=150)
+    p.add_argument("--duration", type=float, default=6.0, help="animation length in seconds")
+    p.add_argument("--force", action="store_true", help="re-render even if outputs are up to date")
+    args = p.parse_args(argv)
+
+    args.formats = [f.strip().lower() for f in args.formats.split(",") if f.strip()]
+    bad = [f for f in args.formats if f not in STILL_FORMATS + ANIM_FORMATS]
+    if bad:
+        p.error(f"unsupported format(s): {', '.join(bad)}")
+    if "mp4" in args.formats and not FFMpegWriter.isAvailable():
+        p.error("mp4 output needs ffmpeg on PATH")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    pairs = find_pairs(args.inputs)
+    if not pairs:
+        print("No *graph_data.json inputs found.", file=sys.stderr)
+        return 1
+
+    base_dir = os.path.commonpath([os.path.dirname(g) for g, _ in pairs])
+    jobs = [
+        (g, a, output_stem(g, base_dir, args.out_dir), args.formats,
+         args.dpi, args.duration, args.force)
+        for g, a in pairs
+    ]
+
+    written = skipped = failed = 0
+    workers = max(1, min(args.jobs, len(jobs)))
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for res in pool.map(render_job, jobs, chunksize=chunksize):
+            written += len(res["written"])
+            skipped += len(res["skipped"])
+            if res["error"]:
+                failed += 1
+                print(f"FAILED {res['graph']}: {res['error']}", file=sys.stderr)
+
+    print(f"{len(jobs)} inputs: {written} written, {skipped} up to date/skipped, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,37 +1,81 @@
 #!/usr/bin/env python3
 """
-Module 3 — Dark-themed Animated RAG Visualizer (single-file)
-Drop this file next to graph_data.json and analysis_output.json and run:
+Module 3 — Dark-themed Animated RAG Visualizer
+Drop this file (with rag_render.py) next to graph_data.json and analysis_output.json and run:
     python module3_visualizer.py
 """
 
-import json
-import math
 import os
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
-import networkx as nx
 import matplotlib
 matplotlib.use("TkAgg")
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 from matplotlib.animation import FuncAnimation
 
+from rag_render import (
+    BG, PANEL_BG, TEXT, FPS, GRAPH_FILE, ANALYSIS_FILE,
+    read_json_files, build_graph, compute_layout, diff_graphs,
+    dead_nodes, draw_edge, draw_node, draw_title, draw_graph,
+    cycle_edges_for, frame_count, draw_pulse_frame,
+)
+
+WATCH_INTERVAL = 1.0      # seconds between file polls in watch mode
+QUEUE_POLL_MS = 100       # how often the UI thread drains worker results
+
 # -----------------------
-# Theme & Colors (dark)
+# File watching (worker thread)
 # -----------------------
-BG = "#0f1722"            # page bg (dark navy)
-PANEL_BG = "#111827"      # sidebar
-TEXT = "#e6eef6"          # light text
-PROCESS_COLOR = "#3b82f6" # bright blue
-RESOURCE_COLOR = "#10b981" # mint green
-DEADLOCK_COLOR = "#ff416c" # vivid red/pink
-REQUEST_EDGE = "#60a5fa"
-ALLOC_EDGE = "#34d399"
-NORMAL_EDGE = "#7c8b95"
-NODE_SIZE = 1400
-FPS = 20
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+class FileWatcher(threading.Thread):
+    """
+    Polls graph_data.json / analysis_output.json and, when either changes,
+    parses + lays out the new graph in this thread. Results are pushed to
+    out_queue as ("update", graph_data, analysis, G, pos) or ("error", msg).
+    """
+
+    def __init__(self, out_queue, prev_pos=None, interval=WATCH_INTERVAL,
+                 graph_path=GRAPH_FILE, analysis_path=ANALYSIS_FILE):
+        super().__init__(daemon=True)
+        self.out_queue = out_queue
+        self.prev_pos = dict(prev_pos or {})
+        self.interval = interval
+        self.graph_path = graph_path
+        self.analysis_path = analysis_path
+        self._stop_event = threading.Event()
+        self._stamps = (_file_stamp(graph_path), _file_stamp(analysis_path))
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            stamps = (_file_stamp(self.graph_path), _file_stamp(self.analysis_path))
+            if stamps == self._stamps or None in stamps:
+                continue
+            try:
+                graph_data, analysis = read_json_files(self.graph_path, self.analysis_path)
+                G = build_graph(graph_data)
+                pos = compute_layout(G, self.prev_pos)
+            except Exception as e:
+                # writer may be mid-save, or the data is malformed; retry on the next tick
+                self.out_queue.put(("error", str(e)))
+                continue
+            self._stamps = stamps
+            self.prev_pos = pos
+            self.out_queue.put(("update", graph_data, analysis, G, pos))
+
 
 # -----------------------
 # Visualizer class
@@ -54,6 +98,8 @@ class RAGVisualizer:
         ttk.Style().configure("TButton", padding=6, font=("Segoe UI", 10))
 
         ttk.Button(sidebar, text="Load JSON", command=self.load_json).pack(**btn_kwargs)
+        self.watch_btn = ttk.Button(sidebar, text="Watch Files", command=self.toggle_watch)
+        self.watch_btn.pack(**btn_kwargs)
         ttk.Button(sidebar, text="Draw Static Graph", command=self.draw_static).pack(**btn_kwargs)
         ttk.Button(sidebar, text="Animate Deadlock", command=self.animate_deadlock).pack(**btn_kwargs)
         ttk.Button(sidebar, text="Export PNG", command=lambda: self.export("png")).pack(**btn_kwargs)
@@ -87,12 +133,19 @@ class RAGVisualizer:
         self.graph_data = {}
         self.analysis = {}
         self.animation = None
+        self.node_artists = {}
+        self.edge_artists = {}
+
+        # Worker -> UI thread handoff
+        self.results = queue.Queue()
+        self.watcher = None
+        self.loading = False
+        self.root.after(QUEUE_POLL_MS, self._drain_results)
 
         # Try auto-load if files present
-        if os.path.exists("graph_data.json") and os.path.exists("analysis_output.json"):
+        if os.path.exists(GRAPH_FILE) and os.path.exists(ANALYSIS_FILE):
             try:
-                self.load_json(silent=True)
-                self.draw_static()
+                self.load_json(silent=True, draw=True)
             except Exception:
                 pass
 
@@ -112,47 +165,134 @@ class RAGVisualizer:
             self.animation = None
 
     # -----------------------
-    # Load JSONs
+    # Load JSONs (parse + layout run in a worker thread)
     # -----------------------
-    def load_json(self, silent=False):
+    def load_json(self, silent=False, draw=False):
+        if self.loading:
+            return
         # stop any running animation
         self._stop_animation_safe()
+        self.loading = True
+        self.status_var.set("Loading...")
 
-        try:
-            with open("graph_data.json", "r") as f:
-                self.graph_data = json.load(f)
-            with open("analysis_output.json", "r") as f:
-                self.analysis = json.load(f)
-        except Exception as e:
-            if not silent:
-                messagebox.showerror("Load Error", f"Could not read JSON files:\n{e}")
-            self.status_var.set("Load failed")
+        def work():
+            try:
+                graph_data, analysis = read_json_files()
+                G = build_graph(graph_data)
+                # deterministic layout for reproducibility
+                pos = compute_layout(G)
+            except Exception as e:
+                self.results.put(("load_error", str(e), silent))
+                return
+            self.results.put(("loaded", graph_data, analysis, G, pos, silent, draw))
+
+        threading.Thread(target=work, daemon=True).start()
+
+    # -----------------------
+    # Watch mode (live reload)
+    # -----------------------
+    def toggle_watch(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+            self.watch_btn.configure(text="Watch Files")
+            self.status_var.set("Watch stopped")
             return
+        self.watcher = FileWatcher(self.results, prev_pos=self.pos)
+        self.watcher.start()
+        self.watch_btn.configure(text="Stop Watching")
+        self.status_var.set("Watching files")
 
-        # build graph
-        self.G = nx.DiGraph()
-        for p in self.graph_data.get("processes", []):
-            self.G.add_node(p, ntype="process")
-        for r in self.graph_data.get("resources", []):
-            self.G.add_node(r, ntype="resource")
-
-        for e in self.graph_data.get("request_edges", []):
-            if len(e) >= 2:
-                self.G.add_edge(e[0], e[1], etype="request")
-        for e in self.graph_data.get("allocation_edges", []):
-            if len(e) >= 2:
-                self.G.add_edge(e[0], e[1], etype="alloc")
-
-        # deterministic layout for reproducibility
+    def _drain_results(self):
         try:
-            self.pos = nx.spring_layout(self.G, seed=42)
-        except Exception:
-            self.pos = {n: (i % 5, i // 5) for i, n in enumerate(self.G.nodes())}
+            while True:
+                msg = self.results.get_nowait()
+                kind = msg[0]
+                if kind == "loaded":
+                    self._on_loaded(*msg[1:])
+                elif kind == "load_error":
+                    self.loading = False
+                    if not msg[2]:
+                        messagebox.showerror("Load Error", f"Could not read JSON files:\n{msg[1]}")
+                    self.status_var.set("Load failed")
+                elif kind == "update":
+                    self._apply_update(*msg[1:])
+                elif kind == "error":
+                    self.status_var.set("Watch: read failed, retrying")
+        except queue.Empty:
+            pass
+        self.root.after(QUEUE_POLL_MS, self._drain_results)
+
+    def _on_loaded(self, graph_data, analysis, G, pos, silent, draw):
+        self.loading = False
+        self.graph_data = graph_data
+        self.analysis = analysis
+        self.G = G
+        self.pos = pos
+        if self.watcher is not None:
+            self.watcher.prev_pos = dict(pos)
 
         self.status_var.set("JSON loaded")
+        if draw:
+            self.draw_static()
+        else:
+            # artists on screen belong to the old graph; next watch update redraws fully
+            self.node_artists = {}
+            self.edge_artists = {}
         if not silent:
             messagebox.showinfo("Loaded", "graph_data.json and analysis_output.json loaded.")
 
+    def _apply_update(self, graph_data, analysis, G, pos):
+        # nothing drawn yet (or an animation owns the axes) -> plain redraw
+        if self.G is None or self.animation is not None or not self.node_artists:
+            self.graph_data, self.analysis, self.G, self.pos = graph_data, analysis, G, pos
+            self.draw_static()
+            return
+
+        diff = diff_graphs(self.G, G)
+        old_dead = self._dead_nodes()
+        self.graph_data, self.analysis, self.pos = graph_data, analysis, pos
+        old_G, self.G = self.G, G
+        new_dead = self._dead_nodes()
+
+        # nodes whose highlight flipped must be restyled, along with their edges
+        flipped = old_dead ^ new_dead
+        redraw_nodes = (diff["added_nodes"] | diff["changed_nodes"] | flipped) & set(G.nodes())
+        redraw_edges = diff["added_edges"] | diff["changed_edges"]
+        redraw_edges |= {e for e in G.edges() if e[0] in flipped or e[1] in flipped}
+
+        # keep the user's zoom/pan
+        xlim, ylim = self.ax.get_xlim(), self.ax.get_ylim()
+
+        for n in diff["removed_nodes"] | redraw_nodes:
+            self._remove_artists(self.node_artists.pop(n, []))
+        for e in diff["removed_edges"] | redraw_edges:
+            self._remove_artists(self.edge_artists.pop(e, []))
+
+        for e in redraw_edges:
+            self._draw_edge(*e)
+        for n in redraw_nodes:
+            self._draw_node(n)
+        self._draw_title()
+
+        self.ax.set_xlim(xlim)
+        self.ax.set_ylim(ylim)
+        try:
+            self.canvas.draw_idle()
+        except Exception:
+            self.canvas.draw()
+
+        changed = sum(len(v) for v in diff.values())
+        self.status_var.set(f"Reloaded ({changed} changes)")
+
+    @staticmethod
+    def _remove_artists(artists):
+        for a in artists:
+            try:
+                a.remove()
+            except Exception:
+                pass
+
     # -----------------------
     # Draw static graph (stops animation first)
     # -----------------------
@@ -164,48 +304,8 @@ class RAGVisualizer:
             self.status_var.set("No graph loaded")
             return
 
-        self.ax.clear()
-        self.ax.set_facecolor(BG)
-        self.ax.set_axis_off()
-
-        dead_nodes = set(self.analysis.get("deadlock_cycle", []))
-        deadlock = bool(self.analysis.get("deadlock", False))
-
-        # draw edges
-        for u, v, data in self.G.edges(data=True):
-            x1, y1 = self.pos.get(u, (0, 0))
-            x2, y2 = self.pos.get(v, (0, 0))
-            if deadlock and u in dead_nodes and v in dead_nodes:
-                color = DEADLOCK_COLOR
-                lw = 3.2
-            else:
-                color = REQUEST_EDGE if data.get("etype") == "request" else ALLOC_EDGE
-                lw = 1.6
-            self.ax.plot([x1, x2], [y1, y2], color=color, linewidth=lw, alpha=0.95, zorder=2)
-
-        # draw nodes
-        for n, data in self.G.nodes(data=True):
-            x, y = self.pos.get(n, (0, 0))
-            if data.get("ntype") == "process":
-                marker = "o"
-                color = PROCESS_COLOR
-            else:
-                marker = "s"
-                color = RESOURCE_COLOR
-
-            if deadlock and n in dead_nodes:
-                color = DEADLOCK_COLOR
-
-            self.ax.scatter(x, y, s=NODE_SIZE, c=color, marker=marker, edgecolors="#0b1220", linewidths=1.1, zorder=5)
-            self.ax.text(x, y, n, fontsize=10, ha="center", va="center", color="#041726", zorder=6)
-
-        # title
-        if deadlock:
-            self.ax.set_title("DEADLOCK DETECTED", color=DEADLOCK_COLOR, fontsize=16, pad=12)
-            self.status_var.set("Deadlock detected")
-        else:
-            self.ax.set_title("SAFE STATE — NO DEADLOCK", color="#34d399", fontsize=16, pad=12)
-            self.status_var.set("Safe state")
+        self.node_artists, self.edge_artists = draw_graph(self.ax, self.G, self.pos, self.analysis)
+        self._set_state_status()
 
         # draw immediately
         try:
@@ -213,6 +313,25 @@ class RAGVisualizer:
         except Exception:
             self.canvas.draw()
 
+    def _dead_nodes(self):
+        return dead_nodes(self.analysis)
+
+    def _draw_edge(self, u, v):
+        self.edge_artists[(u, v)] = draw_edge(self.ax, self.G, self.pos, u, v, self._dead_nodes())
+
+    def _draw_node(self, n):
+        self.node_artists[n] = draw_node(self.ax, self.G, self.pos, n, self._dead_nodes())
+
+    def _draw_title(self):
+        draw_title(self.ax, self.analysis)
+        self._set_state_status()
+
+    def _set_state_status(self):
+        if self.analysis.get("deadlock", False):
+            self.status_var.set("Deadlock detected")
+        else:
+            self.status_var.set("Safe state")
+
     # -----------------------
     # Animate deadlock (pulsing nodes + guaranteed red cycle edges)
     # -----------------------
@@ -239,23 +358,12 @@ class RAGVisualizer:
                 # fallback place
                 self.pos[n] = (len(self.pos), 0)
 
-        # Build guaranteed cycle edges between successive cycle nodes (wrap-around)
-        cycle_edges = []
-        if len(cycle) > 1:
-            for i in range(len(cycle)):
-                u = cycle[i]
-                v = cycle[(i + 1) % len(cycle)]
-                cycle_edges.append((u, v))
-
-        # Also include any edges present among cycle nodes (fallback)
-        for u, v in self.G.edges():
-            if u in cycle and v in cycle and (u, v) not in cycle_edges:
-                cycle_edges.append((u, v))
+        cycle_edges = cycle_edges_for(self.G, cycle)
 
         # draw static as base
         self.draw_static()
 
-        frames = max(12, int(FPS * duration_seconds))
+        frames = frame_count(duration_seconds)
         drawn_artists = []
 
         def update(frame):
@@ -267,32 +375,7 @@ class RAGVisualizer:
                     pass
             drawn_artists.clear()
 
-            t = frame / frames
-            pulse = 1.0 + 0.28 * math.sin(2 * math.pi * t)   # node size factor
-            glow = 0.25 + 0.75 * abs(math.sin(2 * math.pi * t * 1.2))  # edge alpha
-
-            # pulsing nodes (draw on top)
-            for n in cycle:
-                x, y = self.pos[n]
-                sc = self.ax.scatter([x], [y],
-                                     s=NODE_SIZE * pulse,
-                                     c=DEADLOCK_COLOR,
-                                     edgecolors="#0b1220",
-                                     linewidths=1.2,
-                                     alpha=0.96,
-                                     zorder=20)
-                drawn_artists.append(sc)
-
-            # glowing cycle edges (draw on top)
-            for (u, v) in cycle_edges:
-                x1, y1 = self.pos[u]
-                x2, y2 = self.pos[v]
-                ln, = self.ax.plot([x1, x2], [y1, y2],
-                                   color=DEADLOCK_COLOR,
-                                   linewidth=3.0 + 2.0 * pulse,
-                                   alpha=glow,
-                                   zorder=18)
-                drawn_artists.append(ln)
+            drawn_artists.extend(draw_pulse_frame(self.ax, self.pos, cycle, cycle_edges, frame, frames))
 
             # queue draw
             self.canvas.draw_idle()
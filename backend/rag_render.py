@@ -0,0 +1,211 @@
+"""
+Module 3 — shared RAG rendering helpers (no Tk)
+Graph loading, layout and the dark-theme drawing / deadlock pulse logic used
+by both the Tk visualizer (module3_visualizer.py) and the headless batch
+renderer (module3_batch.py). Never selects a matplotlib backend itself.
+"""
+
+import json
+import math
+
+import networkx as nx
+
+# -----------------------
+# Theme & Colors (dark)
+# -----------------------
+BG = "#0f1722"            # page bg (dark navy)
+PANEL_BG = "#111827"      # sidebar
+TEXT = "#e6eef6"          # light text
+PROCESS_COLOR = "#3b82f6" # bright blue
+RESOURCE_COLOR = "#10b981" # mint green
+DEADLOCK_COLOR = "#ff416c" # vivid red/pink
+REQUEST_EDGE = "#60a5fa"
+ALLOC_EDGE = "#34d399"
+NORMAL_EDGE = "#7c8b95"
+NODE_SIZE = 1400
+FPS = 20
+
+GRAPH_FILE = "graph_data.json"
+ANALYSIS_FILE = "analysis_output.json"
+
+# -----------------------
+# Loading helpers (safe to run off the Tk thread)
+# -----------------------
+def read_json_files(graph_path=GRAPH_FILE, analysis_path=ANALYSIS_FILE):
+    with open(graph_path, "r") as f:
+        graph_data = json.load(f)
+    with open(analysis_path, "r") as f:
+        analysis = json.load(f)
+    if not isinstance(graph_data, dict) or not isinstance(analysis, dict):
+        raise ValueError("graph_data.json and analysis_output.json must contain JSON objects")
+    return graph_data, analysis
+
+
+def build_graph(graph_data):
+    G = nx.DiGraph()
+    for p in graph_data.get("processes", []):
+        G.add_node(p, ntype="process")
+    for r in graph_data.get("resources", []):
+        G.add_node(r, ntype="resource")
+
+    for e in graph_data.get("request_edges", []):
+        if len(e) >= 2:
+            G.add_edge(e[0], e[1], etype="request")
+    for e in graph_data.get("allocation_edges", []):
+        if len(e) >= 2:
+            G.add_edge(e[0], e[1], etype="alloc")
+    return G
+
+
+def compute_layout(G, prev_pos=None):
+    """
+    Deterministic spring layout. Nodes already placed in prev_pos keep
+    their coordinates so a reload does not shuffle the picture.
+    """
+    prev_pos = prev_pos or {}
+    kept = [n for n in G.nodes() if n in prev_pos]
+    try:
+        if kept and len(kept) == G.number_of_nodes():
+            return {n: prev_pos[n] for n in G.nodes()}
+        if kept:
+            return nx.spring_layout(G, pos={n: prev_pos[n] for n in kept},
+                                    fixed=kept, seed=42)
+        return nx.spring_layout(G, seed=42)
+    except Exception:
+        return {n: prev_pos.get(n, (i % 5, i // 5)) for i, n in enumerate(G.nodes())}
+
+
+def diff_graphs(old, new):
+    """
+    Compare two graphs. Returns dict with added/removed/changed nodes and edges;
+    'changed' means the node/edge exists in both but its attributes differ.
+    """
+    old = old if old is not None else nx.DiGraph()
+    old_nodes, new_nodes = set(old.nodes()), set(new.nodes())
+    old_edges, new_edges = set(old.edges()), set(new.edges())
+    return {
+        "added_nodes": new_nodes - old_nodes,
+        "removed_nodes": old_nodes - new_nodes,
+        "changed_nodes": {n for n in old_nodes & new_nodes if old.nodes[n] != new.nodes[n]},
+        "added_edges": new_edges - old_edges,
+        "removed_edges": old_edges - new_edges,
+        "changed_edges": {e for e in old_edges & new_edges if old.edges[e] != new.edges[e]},
+    }
+
+
+# -----------------------
+# Static drawing (onto any matplotlib Axes)
+# -----------------------
+def dead_nodes(analysis):
+    if not analysis.get("deadlock", False):
+        return set()
+    return set(analysis.get("deadlock_cycle", []))
+
+
+def draw_edge(ax, G, pos, u, v, dead):
+    data = G.edges[u, v]
+    x1, y1 = pos.get(u, (0, 0))
+    x2, y2 = pos.get(v, (0, 0))
+    if u in dead and v in dead:
+        color = DEADLOCK_COLOR
+        lw = 3.2
+    else:
+        color = REQUEST_EDGE if data.get("etype") == "request" else ALLOC_EDGE
+        lw = 1.6
+    return ax.plot([x1, x2], [y1, y2], color=color, linewidth=lw, alpha=0.95, zorder=2)
+
+
+def draw_node(ax, G, pos, n, dead):
+    data = G.nodes[n]
+    x, y = pos.get(n, (0, 0))
+    if data.get("ntype") == "process":
+        marker = "o"
+        color = PROCESS_COLOR
+    else:
+        marker = "s"
+        color = RESOURCE_COLOR
+
+    if n in dead:
+        color = DEADLOCK_COLOR
+
+    sc = ax.scatter(x, y, s=NODE_SIZE, c=color, marker=marker, edgecolors="#0b1220", linewidths=1.1, zorder=5)
+    txt = ax.text(x, y, n, fontsize=10, ha="center", va="center", color="#041726", zorder=6)
+    return [sc, txt]
+
+
+def draw_title(ax, analysis):
+    if analysis.get("deadlock", False):
+        ax.set_title("DEADLOCK DETECTED", color=DEADLOCK_COLOR, fontsize=16, pad=12)
+    else:
+        ax.set_title("SAFE STATE — NO DEADLOCK", color="#34d399", fontsize=16, pad=12)
+
+
+def draw_graph(ax, G, pos, analysis):
+    """
+    Clear ax and draw the whole graph. Returns (node_artists, edge_artists)
+    keyed by node / (u, v) so callers can update pieces later.
+    """
+    ax.clear()
+    ax.set_facecolor(BG)
+    ax.set_axis_off()
+
+    dead = dead_nodes(analysis)
+    edge_artists = {(u, v): draw_edge(ax, G, pos, u, v, dead) for u, v in G.edges()}
+    node_artists = {n: draw_node(ax, G, pos, n, dead) for n in G.nodes()}
+    draw_title(ax, analysis)
+    return node_artists, edge_artists
+
+
+# -----------------------
+# Deadlock pulse animation
+# -----------------------
+def cycle_edges_for(G, cycle):
+    # guaranteed edges between successive cycle nodes (wrap-around)
+    cycle_edges = []
+    if len(cycle) > 1:
+        for i in range(len(cycle)):
+            u = cycle[i]
+            v = cycle[(i + 1) % len(cycle)]
+            cycle_edges.append((u, v))
+
+    # also include any edges present among cycle nodes (fallback)
+    for u, v in G.edges():
+        if u in cycle and v in cycle and (u, v) not in cycle_edges:
+            cycle_edges.append((u, v))
+    return cycle_edges
+
+
+def frame_count(duration_seconds):
+    return max(12, int(FPS * duration_seconds))
+
+
+def draw_pulse_frame(ax, pos, cycle, cycle_edges, frame, frames):
+    """Draw one pulse frame on top of a static drawing; returns the new artists."""
+    artists = []
+    t = frame / frames
+    pulse = 1.0 + 0.28 * math.sin(2 * math.pi * t)   # node size factor
+    glow = 0.25 + 0.75 * abs(math.sin(2 * math.pi * t * 1.2))  # edge alpha
+
+    # pulsing nodes (draw on top)
+    for n in cycle:
+        x, y = pos[n]
+        sc = ax.scatter([x], [y],
+                        s=NODE_SIZE * pulse,
+                        c=DEADLOCK_COLOR,
+                        edgecolors="#0b1220",
+                        linewidths=1.2,
+                        alpha=0.96,
+                        zorder=20)
+        artists.append(sc)
+
+    # glowing cycle edges (draw on top)
+    for (u, v) in cycle_edges:
+        x1, y1 = pos[u]
+        x2, y2 = pos[v]
+        ln, = ax.plot([x1, x2], [y1, y2],
+                      color=DEADLOCK_COLOR,
+                      linewidth=3.0 + 2.0 * pulse,
+                      alpha=glow,
+                      zorder=18)
+        artists.append(ln)
+    return artists
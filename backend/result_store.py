@@ -0,0 +1,174 @@
+"""
+Persistent result store (SQLite, optional)
+Keeps detection results, layouts and rendered PNG/SVG blobs across restarts,
+keyed by a hash of the normalized graph. Enabled when RAG_STORE_PATH is set:
+ - RAG_STORE_PATH    sqlite file, e.g. /app/data/results.sqlite3
+ - RAG_STORE_MAX_MB  size bound for stored blobs (default 512)
+
+Entries are tagged with the caller's results version; bumping it makes rows
+written by older code invisible (they age out through normal eviction).
+
+Safe to share between threads and worker processes: every thread gets its own
+connection, the database runs in WAL mode, and writers serialize on SQLite's
+lock. The running byte total lives in a trigger-maintained row, so opening the
+store and enforcing the bound never scans the table.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+ACCESS_TOUCH_SECONDS = 60   # don't rewrite last_access on every hit
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key         TEXT NOT NULL,
+    kind        TEXT NOT NULL,
+    data        BLOB NOT NULL,
+    size        INTEGER NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (key, kind)
+);
+CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access);
+
+CREATE TABLE IF NOT EXISTS stats (id INTEGER PRIMARY KEY CHECK (id = 0), total_bytes INTEGER NOT NULL);
+INSERT OR IGNORE INTO stats (id, total_bytes) VALUES (0, 0);
+
+CREATE TRIGGER IF NOT EXISTS entries_ins AFTER INSERT ON entries BEGIN
+    UPDATE stats SET total_bytes = total_bytes + NEW.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_del AFTER DELETE ON entries BEGIN
+    UPDATE stats SET total_bytes = total_bytes - OLD.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_upd AFTER UPDATE OF size ON entries BEGIN
+    UPDATE stats SET total_bytes = total_bytes - OLD.size + NEW.size WHERE id = 0;
+END;
+"""
+
+
+def graph_key(norm):
+    """Stable hash of a normalized payload (order-sensitive, like the results)."""
+    blob = json.dumps(norm, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResultStore:
+    def __init__(self, path, max_bytes, version=1):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn().executescript(SCHEMA)
+
+    @classmethod
+    def from_env(cls, version=1):
+        path = os.environ.get("RAG_STORE_PATH")
+        if not path:
+            return None
+        try:
+            max_mb = float(os.environ.get("RAG_STORE_MAX_MB", "512"))
+            return cls(path, int(max_mb * 1024 * 1024), version)
+        except (sqlite3.Error, OSError, ValueError):
+            # the store is optional; never keep the backend from starting
+            log.exception("Result store disabled: could not open %s", path)
+            return None
+
+    def _kind(self, kind):
+        return f"{kind}@v{self.version}"
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        # never reuse a connection inherited across fork (gunicorn --preload)
+        if conn is None or self._local.pid != os.getpid():
+            # autocommit; explicit BEGIN IMMEDIATE where we need atomicity
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    # -----------------------
+    # Blobs
+    # -----------------------
+    def get(self, key, kind):
+        kind = self._kind(kind)
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT data, last_access FROM entries WHERE key = ? AND kind = ?",
+                (key, kind),
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[1] > ACCESS_TOUCH_SECONDS:
+                conn.execute(
+                    "UPDATE entries SET last_access = ? WHERE key = ? AND kind = ?",
+                    (now, key, kind),
+                )
+            return bytes(row[0])
+        except sqlite3.Error:
+            log.exception("Result store read failed")
+            return None
+
+    def put(self, key, kind, data):
+        kind = self._kind(kind)
+        size = len(data)
+        if size > self.max_bytes:
+            return
+        try:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # upsert (not INSERT OR REPLACE) so the size triggers always fire
+                conn.execute(
+                    "INSERT INTO entries (key, kind, data, size, last_access) "
+                    "VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (key, kind) DO UPDATE SET "
+                    "data = excluded.data, size = excluded.size, last_access = excluded.last_access",
+                    (key, kind, sqlite3.Binary(data), size, time.time()),
+                )
+                self._evict(conn, key, kind)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            log.exception("Result store write failed")
+
+    def _evict(self, conn, key, kind):
+        total = conn.execute("SELECT total_bytes FROM stats WHERE id = 0").fetchone()[0]
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return
+
+        # least recently used first (walks the index lazily), never the entry just written
+        victims = []
+        rows = conn.execute(
+            "SELECT rowid, size FROM entries WHERE NOT (key = ? AND kind = ?) ORDER BY last_access",
+            (key, kind),
+        )
+        for rowid, size in rows:
+            victims.append(rowid)
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM entries WHERE rowid = ?", [(r,) for r in victims])
+
+    # -----------------------
+    # JSON values (detection results, layouts)
+    # -----------------------
+    def get_json(self, key, kind):
+        data = self.get(key, kind)
+        return json.loads(data) if data is not None else None
+
+    def put_json(self, key, kind, value):
+        self.put(key, kind, json.dumps(value, separators=(",", ":")).encode("utf-8"))
@@ -391,7 +391,7 @@ useEffect(() => {
 
     let backend = null;
     try {
-      backend = await sendGraphToBackend(payload);
+      backend = await sendGraphToBackend(payload, { compact: true });
     } catch {
       showToast("Backend Offline");
       return;
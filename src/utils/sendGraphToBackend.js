@@ -1,13 +1,49 @@
 // src/utils/sendGraphToBackend.js
 const BACKEND = import.meta.env.VITE_BACKEND_URL || "http://localhost:5000";
 
-export async function sendGraphToBackend(payload) {
+// Columnar edge encoding: one node table + integer index arrays instead of
+// one object per edge. The backend's normalize_payload reads it directly.
+export function toColumnarPayload(payload) {
+  const resources = payload.resources || [];
+  const nodes = [
+    ...(payload.processes || []),
+    ...resources.map((r) => (typeof r === "object" ? r.id : r)),
+  ];
+  const index = new Map(nodes.map((n, i) => [n, i]));
+  const indexOf = (n) => {
+    if (!index.has(n)) {
+      index.set(n, nodes.length);
+      nodes.push(n);
+    }
+    return index.get(n);
+  };
+
+  const encode = (edges = []) => {
+    const cols = { from: [], to: [], amount: [] };
+    for (const e of edges) {
+      const [u, v] = Array.isArray(e) ? e : [e.from, e.to];
+      cols.from.push(indexOf(u));
+      cols.to.push(indexOf(v));
+      cols.amount.push(Array.isArray(e) ? 1 : Number(e.amount ?? 1));
+    }
+    return cols;
+  };
+
+  return {
+    ...payload,
+    nodes,
+    request_edges: encode(payload.request_edges),
+    allocation_edges: encode(payload.allocation_edges),
+  };
+}
+
+export async function sendGraphToBackend(payload, { compact = false } = {}) {
   try {
     console.log("Sending to backend:", BACKEND + "/analyze");
     const resp = await fetch(`${BACKEND}/analyze`, {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify(payload),
+      body: JSON.stringify(compact ? toColumnarPayload(payload) : payload),
     });
     if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
     return await resp.json();